@@ -6,9 +6,13 @@ from tkinter import ttk
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Tuple
 
 import fhir_bundle_processor
 from src import observation_processor
+from src import search_index
+
+SEARCH_DEBOUNCE_MS = 40
 
 
 class FHIRExtractorApp:
@@ -22,12 +26,19 @@ class FHIRExtractorApp:
         self.quit = None
         self.tree = None
         self.entry_file = None
+        self.entry_search = None
+        self.search_job = None
         self.root: tk.Tk = tk_root
         self.root.title("FHIR Resource Extractor")
 
         self.file_path: str = ""
         self.patient_info: Dict[str, str] = {}
         self.diagnostic_reports: List[Dict[str, Any]] = []
+        self.observations: List[Dict[str, Any]] = []
+        self.report_rows: List[Tuple[str, ...]] = []
+        self.sort_ranks: Dict[Tuple[str, bool], List[int]] = {}
+        self.search_index: search_index.SearchIndex = search_index.SearchIndex()
+        self.search_text: tk.StringVar = tk.StringVar()
         self.sort_column = None
         self.sort_order = {}
         self.create_widgets()
@@ -45,6 +56,7 @@ class FHIRExtractorApp:
         self.create_file_selection_frame()
         self.create_patient_info_frame()
         self.create_observation_file_selection_frame()
+        self.create_search_frame()
         self.create_treeview()
         self.create_text_widget()
 
@@ -121,18 +133,26 @@ class FHIRExtractorApp:
         self.label_patient_id.config(text=self.patient_info.get('id', 'N/A'))
 
     def display_reports(self) -> None:
-        # Clear previous results
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        for report in self.diagnostic_reports:
-            self.tree.insert("", "end", values=(
-                report['id'],
-                report['category'],
-                report['code'],
-                report['date'],
-                len(report['results'])
-            ))
+        # Keep the row values as the tree stores them, so searching can sort without querying Tk.
+        # Build them before touching the tree, so a malformed report leaves report_rows in sync with it.
+        report_rows = [tuple(str(value) for value in (
+            report['id'],
+            report['category'],
+            report['code'],
+            report['date'],
+            len(report['results'])
+        )) for report in self.diagnostic_reports]
+
+        # Clear previous results, including rows detached by an active search
+        self.tree.delete(*(str(index) for index in range(len(self.report_rows))))
+        self.report_rows = report_rows
+        self.sort_ranks = {}
+
+        # Rows are keyed by their position in diagnostic_reports, which is also the search index doc ID
+        for index, row in enumerate(self.report_rows):
+            self.tree.insert("", "end", iid=str(index), values=row)
+
+        self.rebuild_search_index()
 
     def on_tree_select(self, event) -> None:
         print(event)
@@ -172,6 +192,10 @@ class FHIRExtractorApp:
         for index, (val, item) in enumerate(data):
             self.tree.move(item, "", index)
 
+        self.sort_column = col
+        self.sort_order[col] = descending
+        self.get_sort_rank(col, descending)
+
         self.tree.heading(col, command=lambda: self.sort_by_column(col, not descending))
 
         for col in self.tree["columns"]:
@@ -197,6 +221,61 @@ class FHIRExtractorApp:
         self.entry_observation_files.insert(0, ';'.join(files))
         self.observation_files = files
 
+        self.observations = []
+        for file in files:
+            try:
+                self.observations.extend(observation_processor.parse_observation_file(file))
+            except Exception as e:
+                self.text_observations.insert(tk.END, f"Failed to extract observations from {file}: {e}\n")
+        self.rebuild_search_index()
+
+    def create_search_frame(self) -> None:
+        frame_search = tk.Frame(self.root)
+        frame_search.pack(fill=tk.X, padx=10, pady=5)
+
+        tk.Label(frame_search, text="Search:").pack(side=tk.LEFT, padx=5)
+        self.entry_search = tk.Entry(frame_search, textvariable=self.search_text)
+        self.entry_search.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.search_text.trace_add("write", self.on_search_changed)
+
+    def rebuild_search_index(self) -> None:
+        self.search_index = search_index.build_report_search_index(
+            self.diagnostic_reports, self.observations, self.patient_info)
+        self.apply_search()
+
+    def on_search_changed(self, *args) -> None:
+        # Debounce so that filtering only runs once the user pauses typing
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DEBOUNCE_MS, self.apply_search)
+
+    def apply_search(self) -> None:
+        self.search_job = None
+        # A single set_children call detaches the non-matching rows and orders the rest
+        self.tree.set_children("", *self.get_filtered_item_ids())
+
+    def get_filtered_item_ids(self) -> List[str]:
+        matches = self.search_index.search(self.search_text.get())
+        indices = sorted(range(len(self.report_rows)) if matches is None else matches)
+
+        # Keep the current column sort, ordered the same way as sort_by_column
+        if self.sort_column is not None:
+            indices.sort(key=self.get_sort_rank(self.sort_column, self.sort_order[self.sort_column]).__getitem__)
+        return [str(index) for index in indices]
+
+    def get_sort_rank(self, col: str, descending: bool) -> List[int]:
+        # Rank each row once per sort order, so filtering only has to sort plain integers
+        if (col, descending) not in self.sort_ranks:
+            col_index = self.tree["columns"].index(col)
+            order = sorted(range(len(self.report_rows)),
+                           key=lambda index: (self.report_rows[index][col_index], str(index)),
+                           reverse=descending)
+            rank = [0] * len(order)
+            for position, index in enumerate(order):
+                rank[index] = position
+            self.sort_ranks[(col, descending)] = rank
+        return self.sort_ranks[(col, descending)]
+
     # Update on_tree_click method to call parse_observation_files
     def on_tree_click(self, event) -> None:
         item = self.tree.identify('item', event.x, event.y)
@@ -15,16 +15,7 @@ def parse_observation_files(file_path: str) -> List[Dict[str, Any]]:
             continue  # Skip directories and non-XML files
 
         try:
-            tree = ET.parse(full_path)
-            root: ET.Element = tree.getroot()
-            observations: List[ET.Element] = root.xpath(f"//fhir:Observation", namespaces=NS)
-            if not observations:
-                raise InvalidFileException(
-                    message='This resource does not contain Observations!'
-                )
-            for observation in observations:
-                obs_details = extract_observation_details(observation)
-                result_array.append(obs_details)
+            result_array.extend(parse_observation_file(full_path))
 
         except ET.XMLSyntaxError as e:
             print(f"Error parsing XML file {full_path}: {e}")
@@ -32,6 +23,18 @@ def parse_observation_files(file_path: str) -> List[Dict[str, Any]]:
     return result_array
 
 
+def parse_observation_file(full_path: str) -> List[Dict[str, Any]]:
+    """Parse a single XML file and extract the details of all its Observations."""
+    tree = ET.parse(full_path)
+    root: ET.Element = tree.getroot()
+    observations: List[ET.Element] = root.xpath(f"//fhir:Observation", namespaces=NS)
+    if not observations:
+        raise InvalidFileException(
+            message='This resource does not contain Observations!'
+        )
+    return [extract_observation_details(observation) for observation in observations]
+
+
 def extract_observation_details(observation: ET.Element) -> Dict[str, Any]:
     """Extract details from an Observation element."""
     return {
@@ -0,0 +1,230 @@
+import csv
+import math
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator
+
+from src.condition_processor import parse_conditions_from_bundle_file
+from src.diagnostic_report_processor import parse_diagnostic_reports_from_bundle_file
+from src.observation_processor import parse_observation_files
+
+DEFAULT_MAX_RECORDS_PER_PARTITION = 50_000
+
+
+def get_observation_patient_id(observation: dict[str, Any]) -> str:
+    """Extract the patient ID from a parsed Observation."""
+    return observation.get('subject', {}).get('id', 'N/A')
+
+
+def get_report_patient_id(report: dict[str, Any]) -> str:
+    """Extract the patient ID from a parsed DiagnosticReport."""
+    return report.get('patient_id', 'N/A')
+
+
+def get_condition_patient_id(condition: dict[str, Any]) -> str:
+    """Extract the patient ID from a parsed Condition."""
+    return condition.get('patient_id', 'N/A')
+
+
+def get_partition_index(patient_id: str, num_partitions: int) -> int:
+    """Map a patient ID to a partition; stable across processes, unlike hash()."""
+    return zlib.crc32(patient_id.encode('utf-8')) % num_partitions
+
+
+def partition_by_patient(records: Iterable[dict[str, Any]],
+                         get_patient_id: Callable[[dict[str, Any]], str],
+                         num_partitions: int) -> tuple[list[list[dict[str, Any]]], list[dict[str, Any]]]:
+    """Hash-partition parsed resources by patient ID; resources without a patient are returned separately."""
+    partitions: list[list[dict[str, Any]]] = [[] for _ in range(num_partitions)]
+    unassigned: list[dict[str, Any]] = []
+    for record in records:
+        patient_id = get_patient_id(record)
+        if patient_id == 'N/A':
+            unassigned.append(record)
+            continue
+        partitions[get_partition_index(patient_id, num_partitions)].append(record)
+    return partitions, unassigned
+
+
+def parse_fhir_datetime(value: str) -> datetime | None:
+    """Parse a FHIR date or dateTime into an aware datetime; partial dates start at their first instant, in UTC."""
+    if value == 'N/A':
+        return None
+    # fromisoformat only accepts a 'Z' suffix from Python 3.11 on
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    if len(value) == 4:
+        value += '-01-01'
+    elif len(value) == 7:
+        value += '-01'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def get_timeline_sort_key(event: dict[str, Any]) -> tuple[bool, datetime]:
+    """Sort events chronologically, with undated or unparseable dates last."""
+    parsed = parse_fhir_datetime(event['date'])
+    return parsed is None, parsed or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def resolve_report_results(report: dict[str, Any],
+                           observation_index: dict[tuple[str, str], dict[str, Any]]) -> list[dict[str, Any]]:
+    """Resolve the observation references of a DiagnosticReport against a (patient ID, observation ID) index."""
+    patient_id = get_report_patient_id(report)
+    resolved = []
+    for result in report['results']:
+        observation = None
+        if result['observation_ref'] != 'N/A':
+            observation = observation_index.get((patient_id, result['observation_ref']))
+        resolved.append({**result, 'observation': observation})
+    return resolved
+
+
+def build_partition_timelines(partition: tuple[list[dict[str, Any]],
+                                               list[dict[str, Any]],
+                                               list[dict[str, Any]]]) -> dict[str, list[dict[str, Any]]]:
+    """Join the Conditions, DiagnosticReports and Observations of one partition into per-patient timelines.
+
+    A report result only resolves to an Observation of the same patient; references to Observations
+    of other patients, or without a subject or id, resolve to None, as do results without a reference.
+    Resolved Observations are only embedded in their report, all others become events of their own.
+    """
+    conditions, reports, observations = partition
+    observation_index = {
+        (get_observation_patient_id(observation), observation['id']): observation
+        for observation in observations
+        if observation['id'] != 'N/A'
+    }
+
+    timelines: dict[str, list[dict[str, Any]]] = {}
+    for condition in conditions:
+        date = condition['onset_date_time']
+        if date == 'N/A':
+            date = condition['date_recorded']
+        timelines.setdefault(get_condition_patient_id(condition), []).append({
+            'date': date,
+            'resource_type': 'Condition',
+            'resource': condition
+        })
+
+    resolved_ids: set[int] = set()
+    for report in reports:
+        results = resolve_report_results(report, observation_index)
+        resolved_ids.update(id(r['observation']) for r in results if r['observation'] is not None)
+        timelines.setdefault(get_report_patient_id(report), []).append({
+            'date': report['effective_date_time'],
+            'resource_type': 'DiagnosticReport',
+            'resource': {**report, 'results': results}
+        })
+
+    for observation in observations:
+        if id(observation) in resolved_ids:
+            continue
+        timelines.setdefault(get_observation_patient_id(observation), []).append({
+            'date': observation['date'],
+            'resource_type': 'Observation',
+            'resource': observation
+        })
+
+    for events in timelines.values():
+        events.sort(key=get_timeline_sort_key)
+    return timelines
+
+
+def iter_patient_timelines(conditions: list[dict[str, Any]],
+                           reports: list[dict[str, Any]],
+                           observations: list[dict[str, Any]],
+                           max_records_per_partition: int = DEFAULT_MAX_RECORDS_PER_PARTITION,
+                           max_workers: int | None = None) -> Iterator[dict[str, list[dict[str, Any]]]]:
+    """Yield chronologically merged per-patient timelines, one partition at a time.
+
+    All three resource lists are hash-partitioned by patient ID, so each partition holds every
+    resource of its patients and is joined independently in a worker process. The number of
+    partitions grows with the input so that a partition holds max_records_per_partition resources
+    on average; that bounds what each worker receives and returns, not the parent, which keeps the
+    partitioned input. At most max_workers partitions are in flight, and partitions are yielded in
+    order instead of being merged, so the output is reproducible and the caller decides how many
+    timelines to keep. Resources without a patient reference are skipped.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    total_records = len(conditions) + len(reports) + len(observations)
+    num_partitions = max(1, math.ceil(total_records / max_records_per_partition))
+    partitioned = [
+        partition_by_patient(conditions, get_condition_patient_id, num_partitions),
+        partition_by_patient(reports, get_report_patient_id, num_partitions),
+        partition_by_patient(observations, get_observation_patient_id, num_partitions)
+    ]
+    unassigned = sum(len(records) for _, records in partitioned)
+    if unassigned:
+        print(f"Skipped {unassigned} resources without a patient reference")
+    partitions = zip(*(partitions for partitions, _ in partitioned))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[Future] = deque()
+        for partition in partitions:
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(build_partition_timelines, partition))
+        while pending:
+            yield pending.popleft().result()
+
+
+def get_event_id(event: dict[str, Any]) -> str:
+    """Extract the resource ID of a timeline event."""
+    resource = event['resource']
+    if event['resource_type'] == 'Condition':
+        return resource.get('condition_id', 'N/A')
+    if event['resource_type'] == 'DiagnosticReport':
+        return resource.get('report_id', 'N/A')
+    return resource.get('id', 'N/A')
+
+
+def get_event_description(event: dict[str, Any]) -> str:
+    """Extract a short description of a timeline event."""
+    resource = event['resource']
+    if event['resource_type'] == 'Condition':
+        return resource.get('condition_text', 'N/A')
+    if event['resource_type'] == 'DiagnosticReport':
+        observations = '; '.join(
+            [f"{r['observation']['code']}: {r['observation']['value']} {r['observation']['unit']}"
+             if r['observation'] is not None else f"{r['observation_display']} (ID: {r['observation_ref']})"
+             for r in resource['results']])
+        return f"{resource.get('code', 'N/A')} [{observations}]"
+    return f"{resource.get('code', 'N/A')}: {resource.get('value', 'N/A')} {resource.get('unit', 'N/A')}"
+
+
+def export_timelines_to_csv(partition_timelines: Iterable[dict[str, list[dict[str, Any]]]],
+                            output_file: str) -> None:
+    """Export the patient timelines to a CSV file as each partition arrives."""
+    columns: list[str] = ['patient_id', 'date', 'resource_type', 'resource_id', 'description']
+    with open(output_file, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        for timelines in partition_timelines:
+            for patient_id, events in timelines.items():
+                for event in events:
+                    writer.writerow({
+                        'patient_id': patient_id,
+                        'date': event['date'],
+                        'resource_type': event['resource_type'],
+                        'resource_id': get_event_id(event),
+                        'description': get_event_description(event)
+                    })
+
+
+if __name__ == "__main__":
+    patient_timelines = iter_patient_timelines(
+        conditions=parse_conditions_from_bundle_file("../resources/Conditions"),
+        reports=parse_diagnostic_reports_from_bundle_file("../resources/BundleDiagnosticReports"),
+        observations=parse_observation_files("../resources/Observations")
+    )
+
+    output_csv = '../output/patient_timelines.csv'
+    export_timelines_to_csv(patient_timelines, output_csv)
+    print(f"Results exported to {output_csv}")
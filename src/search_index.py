@@ -0,0 +1,83 @@
+# search_index.py
+import re
+from bisect import bisect_left
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+REPORT_SEARCH_FIELDS = ('id', 'category', 'code')
+OBSERVATION_SEARCH_FIELDS = ('id', 'category', 'code', 'value_string', 'interpretation')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into case-folded word tokens."""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+class SearchIndex:
+    """In-memory inverted index from tokens to document IDs with prefix lookup."""
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Set[int]] = {}
+        self.sorted_tokens: List[str] = []
+
+    def add(self, doc_id: int, texts: Iterable[str]) -> None:
+        for text in texts:
+            if not text or text == 'N/A':
+                continue
+            for token in tokenize(text):
+                self.postings.setdefault(token, set()).add(doc_id)
+
+    def finalize(self) -> None:
+        """Sort the vocabulary; must be called after the last add and before searching."""
+        self.sorted_tokens = sorted(self.postings)
+
+    def match_prefix(self, prefix: str) -> Set[int]:
+        """Return the IDs of all documents containing a token that starts with prefix."""
+        matches: Set[int] = set()
+        index = bisect_left(self.sorted_tokens, prefix)
+        while index < len(self.sorted_tokens) and self.sorted_tokens[index].startswith(prefix):
+            matches |= self.postings[self.sorted_tokens[index]]
+            index += 1
+        return matches
+
+    def search(self, query: str) -> Optional[Set[int]]:
+        """Return the IDs of documents matching every query term as a prefix, or None for an empty query."""
+        terms = tokenize(query)
+        if not terms:
+            return None
+
+        # Longer prefixes match fewer tokens, so start with them to keep the intersection small
+        terms.sort(key=len, reverse=True)
+        result = self.match_prefix(terms[0])
+        for term in terms[1:]:
+            if not result:
+                break
+            result &= self.match_prefix(term)
+        return result
+
+
+def build_report_search_index(reports: List[Dict[str, Any]], observations: List[Dict[str, Any]],
+                              patient_info: Dict[str, str]) -> SearchIndex:
+    """Index reports by position, including their patient and the observations each report references."""
+    observation_index = {observation['id']: observation for observation in observations}
+    patient_texts = (patient_info.get('name', ''), patient_info.get('id', ''))
+    index = SearchIndex()
+    for doc_id, report in enumerate(reports):
+        index.add(doc_id, (str(report.get(field, '')) for field in REPORT_SEARCH_FIELDS))
+        index.add(doc_id, patient_texts)
+        for result in report.get('results', []):
+            observation_id = result.get('id', '').split('/')[-1]
+            index.add(doc_id, (observation_id,))
+            observation = observation_index.get(observation_id)
+            if observation is not None:
+                index.add(doc_id, (str(observation.get(field, '')) for field in OBSERVATION_SEARCH_FIELDS))
+                subject = observation.get('subject', {})
+                index.add(doc_id, (subject.get('name', ''), subject.get('id', '')))
+    index.finalize()
+    return index
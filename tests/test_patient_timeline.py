@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+
+from src.patient_timeline import build_partition_timelines
+from src.patient_timeline import get_partition_index
+from src.patient_timeline import iter_patient_timelines
+from src.patient_timeline import parse_fhir_datetime
+from src.patient_timeline import partition_by_patient
+
+
+def make_observation(obs_id: str, patient_id: str, date: str) -> dict:
+    return {'id': obs_id, 'subject': {'name': 'N/A', 'id': patient_id}, 'date': date,
+            'code': 'Hemoglobin', 'value': '12', 'unit': 'g/dL'}
+
+
+def make_report(report_id: str, patient_id: str, date: str, refs: list[str]) -> dict:
+    return {'report_id': report_id, 'patient_id': patient_id, 'effective_date_time': date, 'code': 'CBC',
+            'results': [{'observation_ref': ref, 'observation_display': ref} for ref in refs]}
+
+
+def make_condition(condition_id: str, patient_id: str, onset: str, recorded: str = 'N/A') -> dict:
+    return {'condition_id': condition_id, 'patient_id': patient_id, 'onset_date_time': onset,
+            'date_recorded': recorded, 'condition_text': 'Anemia'}
+
+
+def test_partition_index_is_stable():
+    assert get_partition_index('patient-1', 16) == get_partition_index('patient-1', 16)
+    assert 0 <= get_partition_index('patient-1', 16) < 16
+
+
+def test_partition_by_patient_groups_patients_and_separates_unassigned():
+    records = [make_condition('c1', 'p1', '2020'), make_condition('c2', 'p1', '2021'),
+               make_condition('c3', 'N/A', '2022')]
+    partitions, unassigned = partition_by_patient(records, lambda r: r['patient_id'], 4)
+    assert [r['condition_id'] for r in unassigned] == ['c3']
+    assert [r['condition_id'] for r in partitions[get_partition_index('p1', 4)]] == ['c1', 'c2']
+
+
+def test_parse_fhir_datetime_handles_offsets_and_partial_dates():
+    assert parse_fhir_datetime('2020-01-01T23:00:00-05:00') > parse_fhir_datetime('2020-01-02T01:00:00Z')
+    assert parse_fhir_datetime('2020') == datetime(2020, 1, 1, tzinfo=timezone.utc)
+    assert parse_fhir_datetime('2020-03') == datetime(2020, 3, 1, tzinfo=timezone.utc)
+    assert parse_fhir_datetime('2020-01-02T01:00:00Z') == datetime(2020, 1, 2, 1, tzinfo=timezone.utc)
+    assert parse_fhir_datetime('N/A') is None
+    assert parse_fhir_datetime('not a date') is None
+
+
+def test_report_results_resolve_only_within_patient():
+    observations = [make_observation('o1', 'p1', '2020-01-02'), make_observation('o2', 'p2', '2020-01-02')]
+    reports = [make_report('r1', 'p1', '2020-01-03', ['o1', 'o2'])]
+    timelines = build_partition_timelines(([], reports, observations))
+
+    results = timelines['p1'][0]['resource']['results']
+    assert results[0]['observation'] is observations[0]
+    assert results[1]['observation'] is None
+    # o1 is embedded in its report, o2 stays an event of its own
+    assert [e['resource_type'] for e in timelines['p1']] == ['DiagnosticReport']
+    assert [e['resource']['id'] for e in timelines['p2']] == ['o2']
+
+
+def test_missing_references_and_ids_are_not_joined():
+    observations = [make_observation('N/A', 'p1', '2020-01-02')]
+    reports = [make_report('r1', 'p1', '2020-01-03', ['N/A'])]
+    timelines = build_partition_timelines(([], reports, observations))
+
+    assert timelines['p1'][1]['resource']['results'][0]['observation'] is None
+    assert [e['resource_type'] for e in timelines['p1']] == ['Observation', 'DiagnosticReport']
+
+
+def test_timeline_is_chronological_with_undated_last():
+    conditions = [make_condition('c1', 'p1', 'N/A', '2020-01-02'), make_condition('c2', 'p1', 'N/A')]
+    observations = [make_observation('o1', 'p1', '2020-01-02T01:00:00Z'),
+                    make_observation('o2', 'p1', '2020-01-01T23:00:00-05:00')]
+    timelines = build_partition_timelines((conditions, [], observations))
+
+    ids = [e['resource'].get('condition_id', e['resource'].get('id')) for e in timelines['p1']]
+    assert ids == ['c1', 'o1', 'o2', 'c2']
+
+
+def test_iter_patient_timelines_yields_every_patient_once_in_partition_order():
+    observations = [make_observation(f'o{i}', f'p{i}', '2020') for i in range(20)]
+    observations.append(make_observation('o-none', 'N/A', '2020'))
+    partitions = list(iter_patient_timelines([], [], observations, max_records_per_partition=5, max_workers=2))
+
+    assert len(partitions) == 5
+    patient_ids = [patient_id for timelines in partitions for patient_id in timelines]
+    assert sorted(patient_ids) == sorted(f'p{i}' for i in range(20))
+    assert [get_partition_index(patient_id, 5) for patient_id in patient_ids] == \
+        sorted(get_partition_index(patient_id, 5) for patient_id in patient_ids)
@@ -0,0 +1,66 @@
+from src.search_index import SearchIndex
+from src.search_index import build_report_search_index
+from src.search_index import tokenize
+
+
+def make_index() -> SearchIndex:
+    index = SearchIndex()
+    index.add(0, ('Complete Blood Count', 'Laboratory'))
+    index.add(1, ('Lipid panel', 'Laboratory'))
+    index.add(2, ('Chest X-ray', 'Radiology', 'N/A'))
+    index.finalize()
+    return index
+
+
+def test_tokenize_lowercases_and_splits_on_punctuation():
+    assert tokenize('Chest X-ray, 2 views') == ['chest', 'x', 'ray', '2', 'views']
+
+
+def test_tokenize_keeps_non_ascii_letters():
+    assert tokenize('José Größe 5 µmol/L') == ['josé', 'grösse', '5', 'μmol', 'l']
+
+
+def test_search_matches_prefixes():
+    index = make_index()
+    assert index.search('lab') == {0, 1}
+    assert index.search('RAD') == {2}
+    assert index.search('zzz') == set()
+
+
+def test_search_intersects_all_terms():
+    index = make_index()
+    assert index.search('lab lip') == {1}
+    assert index.search('lab chest') == set()
+
+
+def test_search_matches_non_ascii_terms():
+    index = SearchIndex()
+    index.add(0, ('José Muñoz', 'Größe'))
+    index.add(1, ('Jose Munoz',))
+    index.finalize()
+    assert index.search('JOSÉ') == {0}
+    assert index.search('größ') == {0}
+    assert index.search('ñ') == set()
+
+
+def test_empty_query_returns_none():
+    assert make_index().search('  ') is None
+
+
+def test_placeholder_values_are_not_indexed():
+    assert make_index().search('n') == set()
+
+
+def test_report_index_includes_patient_and_referenced_observations():
+    reports = [
+        {'id': 'r1', 'category': 'Laboratory', 'code': 'CBC', 'results': [{'id': 'Observation/o1'}]},
+        {'id': 'r2', 'category': 'Radiology', 'code': 'Chest X-ray', 'results': []}
+    ]
+    observations = [{'id': 'o1', 'category': 'lab', 'code': 'Hemoglobin',
+                     'subject': {'name': 'Jane Doe', 'id': 'p42'}}]
+    index = build_report_search_index(reports, observations, {'name': 'Jane Doe', 'id': 'p42'})
+
+    assert index.search('hemo') == {0}
+    assert index.search('o1') == {0}
+    assert index.search('jane') == {0, 1}
+    assert index.search('chest') == {1}